@@ -4,12 +4,16 @@ Handles database connection, table creation, and basic operations
 """
 
 import asyncio
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from models.base import get_engine, get_session_factory, Base
 from models.contact import Contact
 from config import settings
 
+# Connectivity probe, built once and reused by test_connection
+_PING_STMT = text("SELECT 1")
+
 
 class DatabaseManager:
     """Manages database operations and connections"""
@@ -33,35 +37,43 @@ class DatabaseManager:
         return self._session_factory
     
     async def create_tables(self):
-        """Create all database tables"""
+        """Create any missing database tables"""
         async with self.engine.begin() as conn:
-            # Drop tables if they exist (for development)
-            await conn.run_sync(Base.metadata.drop_all)
-            # Create all tables
+            # Only drop existing tables when explicitly requested in development
+            if settings.DROP_TABLES and settings.ENVIRONMENT == "development":
+                await conn.run_sync(Base.metadata.drop_all)
+                print("🗑️ Existing database tables dropped")
+            # Create all tables (no-op for tables that already exist)
             await conn.run_sync(Base.metadata.create_all)
             print("✅ Database tables created successfully")
     
     async def create_indexes(self):
         """Create additional database indexes for performance"""
         async with self.engine.begin() as conn:
-            # Create composite index for email and phone lookup
-            await conn.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_contacts_email_phone 
-                ON contacts(email, phone_number) 
-                WHERE email IS NOT NULL OR phone_number IS NOT NULL
-            """))
+            # The identify lookup is "email = :e OR phone_number = :p" on active rows,
+            # which Postgres runs as a BitmapOr of two single-column probes, so a
+            # composite (email, phone_number) index is never used for it
+            await conn.execute(text("DROP INDEX IF EXISTS idx_contacts_email_phone"))
+            await conn.execute(text("DROP INDEX IF EXISTS idx_contacts_email_not_null"))
+            await conn.execute(text("DROP INDEX IF EXISTS idx_contacts_phone_not_null"))
+            # Full single-column indexes once created by the model; superseded below
+            await conn.execute(text("DROP INDEX IF EXISTS ix_contacts_email"))
+            await conn.execute(text("DROP INDEX IF EXISTS ix_contacts_phone_number"))
             
-            # Create partial indexes for better performance
+            # Partial covering indexes for the lookup; INCLUDE carries the columns the
+            # cluster CTE anchor selects (id, linked_id) so it can run index-only
             await conn.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_contacts_email_not_null 
+                CREATE INDEX IF NOT EXISTS idx_contacts_email_active 
                 ON contacts(email) 
-                WHERE email IS NOT NULL
+                INCLUDE (id, linked_id) 
+                WHERE email IS NOT NULL AND deleted_at IS NULL
             """))
             
             await conn.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_contacts_phone_not_null 
+                CREATE INDEX IF NOT EXISTS idx_contacts_phone_active 
                 ON contacts(phone_number) 
-                WHERE phone_number IS NOT NULL
+                INCLUDE (id, linked_id) 
+                WHERE phone_number IS NOT NULL AND deleted_at IS NULL
             """))
             
             print("✅ Database indexes created successfully")
@@ -83,7 +95,7 @@ class DatabaseManager:
                 print("🏠 Using local database configuration")
             
             async with self.session_factory() as session:
-                result = await session.execute(text("SELECT 1"))
+                result = await session.execute(_PING_STMT)
                 row = result.fetchone()
                 if row and row[0] == 1:
                     print("✅ Database connection successful")
@@ -100,14 +112,24 @@ class DatabaseManager:
         return self.session_factory()
 
 
-# Global database manager instance
-db_manager = DatabaseManager()
+# Global database manager instance, created on first use
+_db_manager: Optional[DatabaseManager] = None
+
+
+def get_db_manager() -> DatabaseManager:
+    """Get the shared database manager, creating it if necessary"""
+    global _db_manager
+    if _db_manager is None:
+        _db_manager = DatabaseManager()
+    return _db_manager
 
 
 async def init_database():
     """Initialize database with tables and indexes"""
     print("🔄 Initializing database...")
     
+    db_manager = get_db_manager()
+    
     # Test connection first
     if not await db_manager.test_connection():
         print("❌ Cannot connect to database. Please check your DATABASE_URL")
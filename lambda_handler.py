@@ -4,6 +4,7 @@ This module adapts the FastAPI application to work with AWS Lambda + API Gateway
 """
 
 import os
+import asyncio
 import logging
 import json
 from mangum import Mangum
@@ -16,22 +17,54 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Log key environment variables once per cold start (without sensitive data)
+logger.info("Environment: %s", os.getenv('ENVIRONMENT', 'not-set'))
+logger.info("RDS Hostname: %s", os.getenv('RDS_HOSTNAME', 'not-set'))
+logger.info("Database URL configured: %s", 'DATABASE_URL' in os.environ)
+
+# Keep one event loop for the life of the container. Mangum runs each request
+# on the current loop, so warm invocations reuse it instead of building a new one
+# (with the uvloop policy) along with the loop-bound state such as the in-flight
+# task table. Connections are not kept: the Lambda engine uses NullPool
+_loop = asyncio.new_event_loop()
+asyncio.set_event_loop(_loop)
+
+# Response body types Mangum should return as text rather than base64
+_TEXT_MIME_TYPES = [
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/vnd.api+json",
+    "text/plain",
+    "text/html"
+]
+
+# Headers for the fallback error response
+_ERROR_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization"
+}
+
+# Debug log template and method key per API Gateway payload format, indexed by "is v2"
+_EVENT_FORMATS = (
+    ("API Gateway v1 event: %s %s", "httpMethod"),
+    ("API Gateway v2 event: %s %s", "method"),
+)
+
 # Configure Mangum adapter for Lambda with proper settings
 handler = Mangum(
     app,
     lifespan="off",  # Disable lifespan events for Lambda
     api_gateway_base_path=None,  # Use root path
-    text_mime_types=[
-        "application/json",
-        "application/javascript",
-        "application/xml",
-        "application/vnd.api+json",
-        "text/plain",
-        "text/html"
-    ],
+    text_mime_types=_TEXT_MIME_TYPES,
     exclude_headers=["x-amzn-trace-id"]  # Exclude AWS-specific headers
 )
 
+# Bound once so each invocation skips the attribute lookup
+_handler_call = handler.__call__
+
 def lambda_handler(event, context):
     """
     AWS Lambda entry point
@@ -43,54 +76,38 @@ def lambda_handler(event, context):
     Returns:
         API Gateway response format
     """
-    # Log environment info for debugging
-    logger.info(f"Lambda function: {context.function_name}")
-    logger.info(f"Lambda version: {context.function_version}")
-    logger.info(f"Remaining time: {context.get_remaining_time_in_millis()}ms")
-    
-    # Log key environment variables (without sensitive data)
-    logger.info(f"Environment: {os.getenv('ENVIRONMENT', 'not-set')}")
-    logger.info(f"RDS Hostname: {os.getenv('RDS_HOSTNAME', 'not-set')}")
-    logger.info(f"Database URL configured: {'DATABASE_URL' in os.environ}")
-    
-    # Log the event structure for debugging
-    logger.info(f"Event keys: {list(event.keys())}")
-    
-    # Detect event format and log appropriately
-    if 'version' in event and event['version'] == '2.0':
-        # API Gateway v2 format
-        method = event.get('requestContext', {}).get('http', {}).get('method', 'UNKNOWN')
-        path = event.get('requestContext', {}).get('http', {}).get('path', 'UNKNOWN')
-        logger.info(f"API Gateway v2 event: {method} {path}")
-    elif 'httpMethod' in event:
-        # API Gateway v1 format
-        method = event.get('httpMethod', 'UNKNOWN')
-        path = event.get('path', 'UNKNOWN')
-        logger.info(f"API Gateway v1 event: {method} {path}")
-    else:
-        logger.info(f"Unknown event format. Event: {json.dumps(event, default=str)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        # Log invocation details for debugging
+        logger.debug("Lambda function: %s", context.function_name)
+        logger.debug("Lambda version: %s", context.function_version)
+        logger.debug("Remaining time: %sms", context.get_remaining_time_in_millis())
+        logger.debug("Event keys: %s", list(event.keys()))
+        
+        # Detect event format and log appropriately
+        is_v2 = event.get('version') == '2.0'
+        if is_v2 or 'httpMethod' in event:
+            template, method_key = _EVENT_FORMATS[is_v2]
+            http = event.get('requestContext', {}).get('http', {}) if is_v2 else event
+            logger.debug(template, http.get(method_key, 'UNKNOWN'), http.get('path', 'UNKNOWN'))
+        else:
+            logger.debug("Unknown event format. Event: %s", json.dumps(event, default=str))
     
     try:
         # Use Mangum to handle the request
-        logger.info("Calling Mangum handler...")
-        response = handler(event, context)
-        logger.info(f"Mangum response status: {response.get('statusCode', 'UNKNOWN')}")
-        logger.info(f"Response headers: {response.get('headers', {})}")
+        response = _handler_call(event, context)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Mangum response status: %s", response.get('statusCode', 'UNKNOWN'))
+            logger.debug("Response headers: %s", response.get('headers', {}))
         return response
         
     except Exception as e:
-        logger.error(f"Lambda handler error: {str(e)}", exc_info=True)
-        logger.error(f"Event that caused error: {json.dumps(event, default=str)}")
+        logger.error("Lambda handler error: %s", e, exc_info=True)
+        logger.error("Event that caused error: %s", event)
         
         # Return error response in API Gateway format
         error_response = {
             "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
-                "Access-Control-Allow-Headers": "Content-Type, Authorization"
-            },
+            "headers": _ERROR_HEADERS,
             "body": json.dumps({
                 "error": "Internal server error", 
                 "message": "An unexpected error occurred",
@@ -98,7 +115,6 @@ def lambda_handler(event, context):
             })
         }
         
-        logger.info(f"Returning error response: {error_response}")
         return error_response
 
 # For local testing
@@ -5,23 +5,60 @@ middleware, and basic health check endpoints. It serves as the main
 entry point for both local development and AWS Lambda deployment.
 """
 
+import asyncio
+
+try:
+    # Faster libuv-based event loop when available. uvicorn's "auto" loop and
+    # http settings already pick uvloop/httptools; the policy covers other loop
+    # creators such as the Lambda handler
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.openapi.docs import (
+    get_redoc_html,
+    get_swagger_ui_html,
+    get_swagger_ui_oauth2_redirect_html
+)
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.exc import InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
 import logging
-import traceback
+import queue
+import secrets
+import time
 from datetime import datetime
+from typing import Dict
+from logging.handlers import QueueHandler, QueueListener
+import orjson
 
 from schemas.identify import IdentifyRequest, IdentifyResponse, ErrorResponse
+from database import get_db_manager
+from middleware import PerformanceMiddleware, performance_registry
 from services.identity_service import identity_service
 from config import settings
 
 # Configure logging
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Outside Lambda, handlers only enqueue records and a listener thread does the
+# blocking stream writes. Lambda can freeze the process before a background
+# thread drains the queue, so it keeps writing synchronously.
+_LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+_log_listener = None
+if settings.is_lambda_environment():
+    logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL), format=_LOG_FORMAT)
+else:
+    _log_queue = queue.SimpleQueue()
+    _stream_handler = logging.StreamHandler()
+    _stream_handler.setFormatter(logging.Formatter(_LOG_FORMAT))
+    _root_logger = logging.getLogger()
+    _root_logger.setLevel(getattr(logging, settings.LOG_LEVEL))
+    _root_logger.addHandler(QueueHandler(_log_queue))
+    _log_listener = QueueListener(_log_queue, _stream_handler, respect_handler_level=True)
+    _log_listener.start()
 logger = logging.getLogger(__name__)
 
 # Create FastAPI application instance
@@ -29,23 +66,97 @@ app = FastAPI(
     title=settings.API_TITLE,
     description=settings.API_DESCRIPTION,
     version=settings.API_VERSION,
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    default_response_class=ORJSONResponse,
+    # Schema and docs routes are registered below so /openapi.json serves cached bytes
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None
 )
 
-# Configure CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE"],
-    allow_headers=["*"],
+@app.on_event("shutdown")
+async def stop_log_listener():
+    """Flush queued log records and stop the listener thread"""
+    if _log_listener is not None:
+        _log_listener.stop()
+
+# Configure CORS middleware (skipped entirely when the gateway in front handles CORS)
+if settings.CORS_ENABLED:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_origin_regex=settings.CORS_ORIGIN_REGEX,
+        allow_credentials=True,
+        allow_methods=("GET", "POST", "PUT", "DELETE"),
+        allow_headers=["*"],
+    )
+
+# Per-endpoint timing, added last so it wraps the other middleware; only
+# recorded when /metrics is there to read it
+if settings.METRICS_ENABLED:
+    app.add_middleware(PerformanceMiddleware, registry=performance_registry)
+
+# Static endpoint payloads, serialized once at startup
+_ROOT_BODY = orjson.dumps({
+    "message": "Identity Reconciliation API is running",
+    "version": settings.API_VERSION,
+    "environment": settings.ENVIRONMENT
+})
+_HEALTH_DB_CONFIG = {
+    "rds_configured": bool(settings.RDS_HOSTNAME and settings.RDS_HOSTNAME != "localhost"),
+    "hostname": settings.RDS_HOSTNAME,
+    "ssl_mode": settings.DB_SSL_MODE
+}
+
+# UTC ISO timestamp for response bodies, rebuilt at most once per second
+_iso_now_cache = [0, ""]
+
+def _iso_now() -> str:
+    """
+    Current UTC time as an ISO string, truncated to whole seconds
+    
+    Health checks and probes only need second resolution, so the string is
+    reused until the clock moves to the next second.
+    """
+    now = int(time.time())
+    if now != _iso_now_cache[0]:
+        _iso_now_cache[0] = now
+        _iso_now_cache[1] = datetime.utcfromtimestamp(now).isoformat()
+    return _iso_now_cache[1]
+
+# Last /health database probe, reused for settings.HEALTH_CHECK_TTL seconds
+_health_cache = {"ts": float("-inf"), "status": "unknown", "error": None}
+
+# Exceptions that mean the database is unreachable rather than a bug in the request path:
+# lost or refused connections, connection pool exhaustion, and timed-out queries
+_DB_UNAVAILABLE_ERRORS = (
+    OperationalError,
+    InterfaceError,
+    PoolTimeoutError,
+    ConnectionError,
+    asyncio.TimeoutError
 )
 
+# Static error payloads, serialized once instead of per error. The /identify
+# ones keep the {"detail": ...} envelope they had when raised as HTTPException
+_INTERNAL_ERROR_BODY = orjson.dumps(ErrorResponse(
+    error="InternalServerError",
+    message="An unexpected error occurred"
+).model_dump())
+_DB_UNAVAILABLE_BODY = orjson.dumps({"detail": ErrorResponse(
+    error="DatabaseConnectionError",
+    message="Database is currently unavailable. Please try again later."
+).model_dump()})
+_IDENTIFY_FAILED_BODY = orjson.dumps({"detail": ErrorResponse(
+    error="InternalServerError",
+    message="Unable to process identity reconciliation request"
+).model_dump()})
+
 # Exception handlers
 @app.exception_handler(ValidationError)
 async def validation_exception_handler(request: Request, exc: ValidationError):
     """Handle Pydantic validation errors"""
-    logger.warning(f"Validation error for {request.url}: {exc}")
+    logger.warning("Validation error for %s: %s", request.url, exc)
     
     error_details = []
     for error in exc.errors():
@@ -55,13 +166,14 @@ async def validation_exception_handler(request: Request, exc: ValidationError):
             "type": error["type"]
         })
     
-    error_response = ErrorResponse(
+    # Built from our own strings and pydantic's error list, so skip re-validation
+    error_response = ErrorResponse.model_construct(
         error="ValidationError",
         message="Request validation failed",
         details={"errors": error_details}
     )
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=400,
         content=error_response.model_dump()
     )
@@ -69,17 +181,15 @@ async def validation_exception_handler(request: Request, exc: ValidationError):
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle unexpected errors"""
-    logger.error(f"Unexpected error for {request.url}: {exc}")
-    logger.error(f"Traceback: {traceback.format_exc()}")
-    
-    error_response = ErrorResponse(
-        error="InternalServerError",
-        message="An unexpected error occurred"
-    )
+    # Short random ID to correlate the client response with the logged traceback
+    error_id = secrets.token_hex(4)
+    logger.error("Unexpected error %s for %s: %s", error_id, request.url, exc, exc_info=exc)
     
-    return JSONResponse(
+    return Response(
+        content=_INTERNAL_ERROR_BODY,
         status_code=500,
-        content=error_response.model_dump()
+        media_type="application/json",
+        headers={"X-Error-ID": error_id}
     )
 
 @app.get("/")
@@ -87,48 +197,48 @@ async def root():
     """
     Root endpoint that returns basic API information
     """
-    return {
-        "message": "Identity Reconciliation API is running",
-        "version": settings.API_VERSION,
-        "environment": settings.ENVIRONMENT
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
     """
     Health check endpoint for monitoring and load balancer health checks
     """
-    # Test database connection
-    db_status = "unknown"
-    db_error = None
-    try:
-        from database import db_manager
-        if await db_manager.test_connection():
-            db_status = "connected"
-        else:
-            db_status = "disconnected"
-    except Exception as e:
-        db_status = "error"
-        db_error = str(e)[:100]
+    # Test database connection, at most once per TTL window and bounded by a timeout
+    # so a hung connection can't hold load balancer probes open
+    now = time.monotonic()
+    if now - _health_cache["ts"] >= settings.HEALTH_CHECK_TTL:
+        db_error = None
+        try:
+            connected = await asyncio.wait_for(
+                get_db_manager().test_connection(),
+                timeout=settings.HEALTH_CHECK_TIMEOUT
+            )
+            db_status = "connected" if connected else "disconnected"
+        except asyncio.TimeoutError:
+            db_status = "timeout"
+            db_error = f"Database check exceeded {settings.HEALTH_CHECK_TIMEOUT}s"
+        except Exception as e:
+            db_status = "error"
+            db_error = str(e)[:100]
+        _health_cache.update(ts=now, status=db_status, error=db_error)
+    
+    db_status = _health_cache["status"]
+    db_error = _health_cache["error"]
+    
+    database = {"status": db_status, **_HEALTH_DB_CONFIG}
+    if db_error:
+        database["error"] = db_error
     
-    response = {
+    # Returning a Response skips FastAPI's jsonable_encoder pass over the dict
+    return ORJSONResponse(content={
         "status": "healthy",
         "environment": settings.ENVIRONMENT,
         "version": settings.API_VERSION,
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _iso_now(),
         "lambda": settings.is_lambda_environment(),
-        "database": {
-            "status": db_status,
-            "rds_configured": bool(settings.RDS_HOSTNAME and settings.RDS_HOSTNAME != "localhost"),
-            "hostname": settings.RDS_HOSTNAME,
-            "ssl_mode": settings.DB_SSL_MODE
-        }
-    }
-    
-    if db_error:
-        response["database"]["error"] = db_error
-    
-    return response
+        "database": database
+    })
 
 @app.get("/test")
 async def test_endpoint():
@@ -139,69 +249,74 @@ async def test_endpoint():
         "message": "Test endpoint working",
         "environment": settings.ENVIRONMENT,
         "lambda": settings.is_lambda_environment(),
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": _iso_now()
     }
 
-@app.get("/debug/contacts")
+async def metrics():
+    """
+    Per-endpoint request counts, latency percentiles and error rates for this process
+    """
+    return ORJSONResponse(content=performance_registry.snapshot())
+
+# Traffic volume, error rates and latencies are not for the public; opt in via METRICS_ENABLED
+if settings.METRICS_ENABLED:
+    app.get("/metrics")(metrics)
+
 async def debug_contacts():
     """
     Debug endpoint to check database contents (DEVELOPMENT ONLY)
     """
-    # SECURITY: Only allow in development environment
-    if not settings.DEBUG or settings.is_production():
-        raise HTTPException(
-            status_code=404,
-            detail="Endpoint not found"
-        )
-    
     try:
-        from database import db_manager
-        
         # Get recent contacts
-        async with db_manager.get_session() as session:
-            from sqlalchemy import text
-            
-            # Count total contacts
-            result = await session.execute(text("SELECT COUNT(*) FROM contacts"))
-            total_count = result.scalar()
-            
-            # Get recent contacts
-            result = await session.execute(text("""
+        async with get_db_manager().get_session() as session:
+            # Get recent contacts, with the planner's row estimate from pg_class in the
+            # same round-trip (an exact COUNT(*) would scan the whole table)
+            result = await session.stream(text("""
                 SELECT id, email, phone_number, link_precedence, linked_id, 
-                       created_at, updated_at
+                       created_at, updated_at,
+                       (SELECT GREATEST(reltuples, 0)::bigint FROM pg_class
+                        WHERE oid = 'contacts'::regclass) AS estimated_total
                 FROM contacts 
                 ORDER BY created_at DESC 
                 LIMIT 10
             """))
             
+            estimated_total = 0
             contacts = []
-            for row in result.fetchall():
+            async for row in result.mappings():
+                estimated_total = row["estimated_total"]
                 contacts.append({
-                    "id": row[0],
-                    "email": row[1],
-                    "phone_number": row[2],
-                    "link_precedence": row[3],
-                    "linked_id": row[4],
-                    "created_at": row[5].isoformat() if row[5] else None,
-                    "updated_at": row[6].isoformat() if row[6] else None
+                    "id": row["id"],
+                    "email": row["email"],
+                    "phone_number": row["phone_number"],
+                    "link_precedence": row["link_precedence"],
+                    "linked_id": row["linked_id"],
+                    "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+                    "updated_at": row["updated_at"].isoformat() if row["updated_at"] else None
                 })
             
             return {
-                "total_contacts": total_count,
+                "estimated_total_contacts": estimated_total,
                 "recent_contacts": contacts,
                 "message": "Database query successful"
             }
             
     except Exception as e:
-        logger.error(f"Debug contacts error: {e}")
+        logger.error("Debug contacts error: %s", e)
         return {
             "error": str(e),
-            "total_contacts": 0,
+            "estimated_total_contacts": 0,
             "recent_contacts": [],
             "message": "Database query failed"
         }
 
-@app.post("/identify", response_model=IdentifyResponse)
+# SECURITY: Only register the debug endpoint in development
+if settings.DEBUG and not settings.is_production():
+    app.get("/debug/contacts")(debug_contacts)
+
+# The service already returns a validated IdentifyResponse, so skip FastAPI's
+# response_model re-validation; the model is still documented for OpenAPI
+@app.post("/identify", response_model=None, responses={200: {"model": IdentifyResponse}})
 async def identify_endpoint(request: IdentifyRequest):
     """
     Main identity reconciliation endpoint
@@ -224,7 +339,7 @@ async def identify_endpoint(request: IdentifyRequest):
     - Two existing primaries with shared info: Links them (older remains primary)
     """
     try:
-        logger.info(f"Processing identify request: email={request.email}, phone={request.phoneNumber}")
+        logger.info("Processing identify request: email=%s, phone=%s", request.email, request.phoneNumber)
         
         # For production deployment, we expect the database to be available
         # If database is not available, we should return an error, not a mock response
@@ -232,56 +347,132 @@ async def identify_endpoint(request: IdentifyRequest):
         # Process the request through our identity service
         response = await identity_service.identify_contact(request)
         
-        logger.info(f"Successfully processed request. Primary contact ID: {response.contact.primaryContatId}")
+        logger.info("Successfully processed request. Primary contact ID: %s", response.contact.primaryContatId)
         
-        return response
+        # Plain ints and strings, so hand orjson the dict directly instead of model_dump()
+        contact = response.contact
+        return ORJSONResponse(content={
+            "contact": {
+                "primaryContatId": contact.primaryContatId,
+                "emails": contact.emails,
+                "phoneNumbers": contact.phoneNumbers,
+                "secondaryContactIds": contact.secondaryContactIds
+            }
+        })
         
     except ValidationError as e:
         # This should be caught by the exception handler, but just in case
-        logger.warning(f"Validation error in identify endpoint: {e}")
+        logger.warning("Validation error in identify endpoint: %s", e)
         raise HTTPException(
             status_code=400,
-            detail=ErrorResponse(
+            detail=ErrorResponse.model_construct(
                 error="ValidationError",
                 message="Invalid request data",
                 details={"validation_errors": e.errors()}
             ).model_dump()
         )
     
+    except _DB_UNAVAILABLE_ERRORS as e:
+        logger.error("Database connection error in identify endpoint: %s", e)
+        return Response(
+            content=_DB_UNAVAILABLE_BODY,
+            status_code=503,
+            media_type="application/json"
+        )
+    
     except Exception as e:
-        # Check if this is a database connection error
-        error_str = str(e).lower()
-        if any(db_error in error_str for db_error in ['connect', 'timeout', 'connection', 'database']):
-            logger.error(f"Database connection error in identify endpoint: {e}")
-            raise HTTPException(
-                status_code=503,
-                detail=ErrorResponse(
-                    error="DatabaseConnectionError",
-                    message="Database is currently unavailable. Please try again later."
-                ).model_dump()
-            )
-        
         # Log the full error for debugging
-        logger.error(f"Error in identify endpoint: {e}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        error_id = secrets.token_hex(4)
+        logger.error("Error %s in identify endpoint: %s", error_id, e, exc_info=True)
         
         # Return generic error to client
-        raise HTTPException(
+        return Response(
+            content=_IDENTIFY_FAILED_BODY,
             status_code=500,
-            detail=ErrorResponse(
-                error="InternalServerError",
-                message="Unable to process identity reconciliation request"
-            ).model_dump()
+            media_type="application/json",
+            headers={"X-Error-ID": error_id}
         )
 
+# OpenAPI schema, serialized once per root path on first use; routes are all registered by now
+_openapi_bodies: Dict[str, bytes] = {}
+
+def _get_openapi_body(root_path: str = "") -> bytes:
+    """Build and serialize the OpenAPI schema once per root path, reusing the bytes afterwards"""
+    body = _openapi_bodies.get(root_path)
+    if body is None:
+        schema = app.openapi()
+        servers = schema.get("servers", [])
+        # Same as FastAPI's own route: behind a proxy prefix, advertise it as a server
+        if root_path and root_path not in {server.get("url") for server in servers}:
+            schema = {**schema, "servers": [{"url": root_path}, *servers]}
+        body = _openapi_bodies[root_path] = orjson.dumps(schema)
+    return body
+
+def _root_path(request: Request) -> str:
+    """Mount prefix added by a proxy or API Gateway stage, without a trailing slash"""
+    return request.scope.get("root_path", "").rstrip("/")
+
+@app.get("/openapi.json", include_in_schema=False)
+async def openapi_schema(request: Request):
+    """
+    OpenAPI schema from pre-serialized bytes
+    """
+    return Response(content=_get_openapi_body(_root_path(request)), media_type="application/json")
+
+@app.get("/docs", include_in_schema=False)
+async def swagger_ui(request: Request):
+    """
+    Swagger UI backed by the cached /openapi.json
+    """
+    root_path = _root_path(request)
+    return get_swagger_ui_html(
+        openapi_url=root_path + "/openapi.json",
+        title=f"{app.title} - Swagger UI",
+        oauth2_redirect_url=root_path + app.swagger_ui_oauth2_redirect_url
+    )
+
+@app.get(app.swagger_ui_oauth2_redirect_url, include_in_schema=False)
+async def swagger_ui_redirect():
+    """
+    OAuth2 redirect target for Swagger UI
+    """
+    return get_swagger_ui_oauth2_redirect_html()
+
+@app.get("/redoc", include_in_schema=False)
+async def redoc(request: Request):
+    """
+    ReDoc backed by the cached /openapi.json
+    """
+    return get_redoc_html(openapi_url=_root_path(request) + "/openapi.json", title=f"{app.title} - ReDoc")
+
+# Long-running servers build the schema during startup instead of on the first docs hit;
+# Lambda skips this to keep it out of the cold start
+if not settings.is_lambda_environment():
+    @app.on_event("startup")
+    async def warm_openapi_schema():
+        """Serialize the OpenAPI schema before serving traffic"""
+        _get_openapi_body()
+
 # This is the proper way to run the application using uvicorn
 if __name__ == "__main__":
     import uvicorn
-    # Use the module:app_instance format for proper reloading
-    uvicorn.run(
-        "main:app",  # This tells uvicorn to import 'app' from 'main.py'
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=settings.DEBUG,  # Enable auto-reload in debug mode
-        workers=1  # Single worker for development
-    )
\ No newline at end of file
+    if settings.is_production():
+        # One process per CPU; reload can't be combined with multiple workers
+        uvicorn.run(
+            "main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            workers=settings.WORKERS,
+            limit_concurrency=settings.LIMIT_CONCURRENCY,
+            backlog=settings.BACKLOG,
+            reload=False
+        )
+    else:
+        # Use the module:app_instance format for proper reloading
+        uvicorn.run(
+            "main:app",  # This tells uvicorn to import 'app' from 'main.py'
+            host=settings.HOST,
+            port=settings.PORT,
+            reload=settings.DEBUG,  # Enable auto-reload in debug mode
+            workers=1  # Single worker for development
+        )
@@ -0,0 +1,12 @@
+"""
+ASGI middleware package for Identity Reconciliation System
+Contains request instrumentation shared by local and Lambda deployments
+"""
+
+from .performance import PerformanceMiddleware, PerformanceRegistry, performance_registry
+
+__all__ = [
+    'PerformanceMiddleware',
+    'PerformanceRegistry',
+    'performance_registry'
+]
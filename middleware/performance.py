@@ -0,0 +1,104 @@
+"""
+Performance middleware for Identity Reconciliation System
+Records per-endpoint request counts, latency percentiles and error rates
+"""
+
+import time
+from collections import deque
+from statistics import quantiles
+from typing import Any, Deque, Dict
+
+
+class EndpointStats:
+    """Running counters for a single endpoint"""
+
+    __slots__ = ("count", "errors", "total_ns", "samples")
+
+    def __init__(self, sample_size: int):
+        self.count = 0
+        self.errors = 0
+        self.total_ns = 0
+        # Most recent latencies, used for percentiles
+        self.samples: Deque[int] = deque(maxlen=sample_size)
+
+    def record(self, elapsed_ns: int, is_error: bool) -> None:
+        """Add one request to the counters"""
+        self.count += 1
+        self.total_ns += elapsed_ns
+        self.samples.append(elapsed_ns)
+        if is_error:
+            self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summarize the counters in milliseconds"""
+        if len(self.samples) >= 2:
+            cuts = quantiles(self.samples, n=20)
+            p50, p95 = cuts[9], cuts[18]
+        else:
+            p50 = p95 = self.samples[0] if self.samples else 0
+        return {
+            "count": self.count,
+            "error_rate": self.errors / self.count if self.count else 0.0,
+            "avg_ms": self.total_ns / self.count / 1e6 if self.count else 0.0,
+            "p50_ms": p50 / 1e6,
+            "p95_ms": p95 / 1e6
+        }
+
+
+class PerformanceRegistry:
+    """Per-endpoint statistics shared between the middleware and the /metrics endpoint"""
+
+    def __init__(self, sample_size: int = 1000):
+        self.sample_size = sample_size
+        self._stats: Dict[str, EndpointStats] = {}
+
+    def record(self, endpoint: str, elapsed_ns: int, is_error: bool) -> None:
+        """Record one request against an endpoint"""
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats[endpoint] = EndpointStats(self.sample_size)
+        stats.record(elapsed_ns, is_error)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Summaries for every endpoint seen so far"""
+        return {endpoint: stats.snapshot() for endpoint, stats in self._stats.items()}
+
+
+class PerformanceMiddleware:
+    """
+    Pure ASGI middleware timing each HTTP request
+
+    Requests are keyed by method and route template rather than raw URL path,
+    so unmatched or probing paths collapse into one bucket.
+    Responses with a 5xx status (or an unhandled exception) count as errors.
+    """
+
+    def __init__(self, app, registry: PerformanceRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter_ns()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed_ns = time.perf_counter_ns() - start
+            route = scope.get("route")
+            endpoint = f"{scope['method']} {route.path}" if route is not None else "unmatched"
+            self.registry.record(endpoint, elapsed_ns, status_code >= 500)
+
+
+# Global registry used by the application
+performance_registry = PerformanceRegistry()
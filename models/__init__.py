@@ -3,7 +3,7 @@ Database models package for Identity Reconciliation System
 Contains SQLAlchemy models for contact information and relationships
 """
 
-from .base import Base, engine, AsyncSessionFactory
+from .base import Base, get_engine, get_session_factory
 from .contact import Contact
 
-__all__ = ['Base', 'engine', 'AsyncSessionFactory', 'Contact'] 
\ No newline at end of file
+__all__ = ['Base', 'get_engine', 'get_session_factory', 'Contact'] 
\ No newline at end of file
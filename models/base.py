@@ -6,6 +6,7 @@ This module sets up the SQLAlchemy declarative base and async engine
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.pool import NullPool
 
 from config import settings
 
@@ -13,40 +14,48 @@ from config import settings
 engine = None
 AsyncSessionFactory = None
 
+def _connect_args(database_url: str, application_name: str, command_timeout: int = None) -> dict:
+    """Build asyncpg-specific connect arguments; other drivers would reject them"""
+    if not database_url.startswith("postgresql+asyncpg"):
+        return {}
+    connect_args = {
+        "server_settings": {
+            "application_name": application_name,
+        }
+    }
+    if command_timeout is not None:
+        connect_args["command_timeout"] = command_timeout
+    return connect_args
+
 def create_database_engine():
     """Create database engine with appropriate settings for environment"""
     database_url = settings.get_active_database_url()
     
     if settings.is_lambda_environment():
-        # Lambda-optimized settings for RDS Proxy
+        # Lambda-optimized settings for RDS Proxy: the proxy does the pooling, and
+        # connections held across frozen invocations go stale, so don't pool here
         return create_async_engine(
             database_url,
             echo=settings.DEBUG,
-            pool_pre_ping=True,  # Essential for Lambda - check connections
-            pool_size=1,  # Small pool for Lambda (single concurrent execution)
-            max_overflow=0,  # No overflow in Lambda
-            pool_recycle=3600,  # Recycle connections after 1 hour
-            pool_timeout=10,  # Quick timeout for Lambda
-            connect_args={
-                "command_timeout": 10,  # Quick command timeout
-                "server_settings": {
-                    "application_name": "identity-reconciliation-lambda",
-                }
-            }
+            poolclass=NullPool,
+            connect_args=_connect_args(
+                database_url,
+                "identity-reconciliation-lambda",
+                command_timeout=10  # Quick command timeout
+            )
         )
     else:
-        # Local development settings
+        # Server / local development settings
         return create_async_engine(
             database_url,
             echo=settings.DEBUG,
             pool_pre_ping=True,
-            pool_size=5,  # Larger pool for local development
-            max_overflow=10,
-            connect_args={
-                "server_settings": {
-                    "application_name": "identity-reconciliation-local",
-                }
-            }
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=30,
+            pool_recycle=1800,  # Recycle connections after 30 minutes
+            pool_use_lifo=True,  # Reuse the most recent connection so idle ones can expire
+            connect_args=_connect_args(database_url, "identity-reconciliation-local")
         )
 
 def get_engine():
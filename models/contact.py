@@ -19,13 +19,16 @@ class Contact(Base):
     - Secondary contacts have linked_id pointing to primary, link_precedence = 'secondary'
     """
     __tablename__ = "contacts"
+    # Timestamps come from the database; fetch them with INSERT ... RETURNING
+    # rather than leaving them expired after a flush
+    __mapper_args__ = {"eager_defaults": True}
     
     # Primary key
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     
     # Contact information (at least one must be provided)
-    phone_number: Mapped[Optional[str]] = mapped_column(String(20), index=True, nullable=True)
-    email: Mapped[Optional[str]] = mapped_column(String(255), index=True, nullable=True)
+    phone_number: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    email: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     
     # Linking information
     linked_id: Mapped[Optional[int]] = mapped_column(
@@ -65,9 +68,13 @@ class Contact(Base):
         back_populates="secondary_contacts"
     )
     
+    # Loaded with one "WHERE linked_id IN (...)" query per batch of contacts rather
+    # than one query per contact; join_depth=1 since secondaries have no secondaries
     secondary_contacts: Mapped[list["Contact"]] = relationship(
         "Contact",
-        back_populates="primary_contact"
+        back_populates="primary_contact",
+        lazy="selectin",
+        join_depth=1
     )
     
     def __repr__(self) -> str:
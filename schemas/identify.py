@@ -6,7 +6,22 @@ Fixed to properly handle "null" strings as null values
 
 import re
 from typing import List, Optional, Dict, Any, Union
-from pydantic import BaseModel, Field, EmailStr, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, field_validator, model_validator
+
+
+# Compiled once at import rather than looked up in re's cache on every request
+_NON_DIGIT_RE = re.compile(r'[^\d]')
+
+# Deletes every ASCII non-digit in one C-level str.translate pass; phone numbers are
+# almost always ASCII, so the regex is only needed for the rare non-ASCII input
+_ASCII_NON_DIGITS = str.maketrans('', '', ''.join(chr(i) for i in range(128) if not chr(i).isdigit()))
+
+def _is_null_token(value: str) -> bool:
+    """
+    True for an already-stripped "" or any casing of "null"
+    Only four-character strings are lowercased for the comparison
+    """
+    return not value or (len(value) == 4 and value.lower() == 'null')
 
 
 class IdentifyRequest(BaseModel):
@@ -38,14 +53,15 @@ class IdentifyRequest(BaseModel):
         if v is None:
             return None
         
-        # Convert "null" string to None (case insensitive)
-        if isinstance(v, str) and v.lower().strip() in ['null', '']:
-            return None
-        
         # If it's a string, validate it as an email
         if isinstance(v, str):
-            # Basic email validation (Pydantic will do the heavy lifting)
             v = v.strip()
+            
+            # Convert empty and "null" strings to None (case insensitive)
+            if _is_null_token(v):
+                return None
+            
+            # Basic email validation (Pydantic will do the heavy lifting)
             if '@' not in v:
                 raise ValueError('Invalid email format: email must contain @')
             return v
@@ -63,10 +79,6 @@ class IdentifyRequest(BaseModel):
         if v is None:
             return None
         
-        # Convert "null" string to None (case insensitive)
-        if isinstance(v, str) and v.lower().strip() in ['null', '']:
-            return None
-        
         # Convert to string if it's a number
         if isinstance(v, (int, float)):
             v = str(int(v))  # Remove decimal point if it's a float
@@ -74,16 +86,16 @@ class IdentifyRequest(BaseModel):
         if not isinstance(v, str):
             raise ValueError('Phone number must be a string or number')
         
-        # Clean the phone number
+        # Clean the phone number; empty and "null" strings become None
         v = v.strip()
-        if not v:  # Empty string after stripping
+        if _is_null_token(v):
             return None
         
-        # Remove all non-digit characters except +
-        cleaned = re.sub(r'[^\d+]', '', v)
-        
         # Basic validation: should have at least 3 digits (flexible for testing)
-        digits_only = re.sub(r'[^\d]', '', cleaned)
+        if v.isascii():
+            digits_only = v.translate(_ASCII_NON_DIGITS)
+        else:
+            digits_only = _NON_DIGIT_RE.sub('', v)
         if len(digits_only) < 3:
             raise ValueError('Phone number must contain at least 3 digits')
         
@@ -99,10 +111,10 @@ class IdentifyRequest(BaseModel):
             raise ValueError('Either email or phoneNumber must be provided')
         return self
     
-    class Config:
-        # Allow both camelCase (API) and snake_case (Python) field names
-        populate_by_name = True
-        json_schema_extra = {
+    # Allow both camelCase (API) and snake_case (Python) field names
+    model_config = ConfigDict(
+        populate_by_name=True,
+        json_schema_extra={
             "examples": [
                 {
                     "email": "customer@example.com",
@@ -122,6 +134,7 @@ class IdentifyRequest(BaseModel):
                 }
             ]
         }
+    )
 
 
 class ContactResponse(BaseModel):
@@ -146,8 +159,7 @@ class ContactResponse(BaseModel):
         examples=[[2, 3, 4]]
     )
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class IdentifyResponse(BaseModel):
@@ -159,8 +171,8 @@ class IdentifyResponse(BaseModel):
         description="Consolidated contact information"
     )
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "contact": {
                     "primaryContatId": 1,
@@ -170,6 +182,7 @@ class IdentifyResponse(BaseModel):
                 }
             }
         }
+    )
 
 
 class ErrorResponse(BaseModel):
@@ -187,8 +200,8 @@ class ErrorResponse(BaseModel):
         description="Additional error details"
     )
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "examples": [
                 {
                     "error": "ValidationError",
@@ -200,4 +213,5 @@ class ErrorResponse(BaseModel):
                     "message": "Unable to connect to database"
                 }
             ]
-        }
\ No newline at end of file
+        }
+    )
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+Identify Cache - In-process LRU/TTL cache of /identify responses
+Serves repeated (email, phoneNumber) requests without touching the database
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+
+class IdentifyCache:
+    """
+    Bounded LRU cache with per-entry TTL, keyed by (email, phoneNumber)
+
+    Each entry remembers the primary contact its response describes, so a write
+    only drops the entries for the clusters it touched. Every write also bumps
+    the generation; results computed under an older generation are discarded on
+    store, so a response read before a concurrent write commits is never cached.
+    Writes made by other processes are not seen, so it is only safe where a
+    single process serves requests (see Settings.IDENTIFY_CACHE_SIZE).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._keys_by_primary: Dict[int, Set[Hashable]] = {}
+        self._generation = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Caching is disabled when either the size or the TTL is zero"""
+        return self.maxsize > 0 and self.ttl > 0
+
+    @property
+    def generation(self) -> int:
+        """Current write generation, captured before computing a cacheable result"""
+        return self._generation
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: int, primary_id: int) -> None:
+        """Store value if no write has happened since generation was captured"""
+        if not self.enabled or generation != self._generation:
+            return
+        self._discard(key)
+        self._entries[key] = (time.monotonic() + self.ttl, primary_id, value)
+        self._keys_by_primary.setdefault(primary_id, set()).add(key)
+        if len(self._entries) > self.maxsize:
+            self._discard(next(iter(self._entries)))
+
+    def invalidate(self, primary_ids: Optional[Iterable[int]] = None) -> None:
+        """Drop the entries for the given clusters after they changed, or all entries"""
+        self._generation += 1
+        if primary_ids is None:
+            self._entries.clear()
+            self._keys_by_primary.clear()
+            return
+        for primary_id in primary_ids:
+            for key in self._keys_by_primary.pop(primary_id, ()):
+                self._entries.pop(key, None)
+
+    def _discard(self, key: Hashable) -> None:
+        """Remove one entry and its reverse-index reference"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._keys_by_primary.get(entry[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_primary[entry[1]]
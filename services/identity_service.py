@@ -4,15 +4,115 @@ Handles contact linking, primary/secondary relationships, and response building
 Fixed to ensure primary contact info appears first in response arrays
 """
 
-from typing import Optional, List, Tuple
+import asyncio
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, and_
-from sqlalchemy.orm import selectinload
-from datetime import datetime
+from sqlalchemy import bindparam, insert, select, or_, text, update
+from sqlalchemy.orm import make_transient_to_detached, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from models.contact import Contact
 from schemas.identify import IdentifyRequest, IdentifyResponse, ContactResponse
-from database import db_manager
+from database import get_db_manager, DatabaseManager
+from services.identify_cache import IdentifyCache
+from config import settings
+
+# Transaction-scoped advisory locks, one per identity key, taken in the order given;
+# released automatically on commit or rollback
+_LOCK_IDENTITY_KEYS_STMT = text(
+    "SELECT pg_advisory_xact_lock(hashtext(k)) FROM unnest(CAST(:keys AS text[])) AS k"
+)
+
+# Transaction-scoped advisory locks, one per primary contact ID, taken in the order
+# given; the two-key form keeps them apart from the single-key identity key locks
+_LOCK_PRIMARY_IDS_STMT = text(
+    "SELECT pg_advisory_xact_lock(1, id) FROM unnest(CAST(:ids AS integer[])) AS id"
+)
+
+
+
+@lru_cache(maxsize=None)
+def _cluster_cte(has_email: bool, has_phone: bool):
+    """
+    Recursive CTE of (id, linked_id) for every contact linked to :email/:phone
+    Starts from the active contacts matching email OR phone and follows
+    linked_id in both directions until the cluster is closed
+    
+    Built once per combination of keys with bound parameters, so requests only
+    supply values instead of rebuilding the expression tree
+    """
+    # Postgres runs the OR as a BitmapOr over the two partial indexes
+    # (idx_contacts_email_active / idx_contacts_phone_active)
+    conditions = []
+    if has_email:
+        conditions.append(Contact.email == bindparam("email"))
+    if has_phone:
+        conditions.append(Contact.phone_number == bindparam("phone"))
+    
+    cluster = select(Contact.id, Contact.linked_id).where(
+        or_(*conditions),
+        Contact.deleted_at.is_(None)  # Only active contacts
+    ).cte("cluster", recursive=True)
+    
+    # UNION (not UNION ALL) drops rows already visited, so the walk terminates
+    return cluster.union(
+        select(Contact.id, Contact.linked_id).join(
+            cluster,
+            or_(Contact.linked_id == cluster.c.id, Contact.id == cluster.c.linked_id)
+        )
+    )
+
+
+@lru_cache(maxsize=None)
+def _cluster_contacts_stmt(has_email: bool, has_phone: bool):
+    """Contact entities for the whole cluster; secondary_contacts are selectin-loaded"""
+    cluster = _cluster_cte(has_email, has_phone)
+    # Re-reads after taking locks must see the committed rows, not the identity map
+    return select(Contact).join(cluster, Contact.id == cluster.c.id).execution_options(
+        populate_existing=True
+    )
+
+
+@lru_cache(maxsize=None)
+def _cluster_rows_stmt(has_email: bool, has_phone: bool):
+    """Plain rows of the columns the read-only path needs, for the whole cluster"""
+    cluster = _cluster_cte(has_email, has_phone)
+    return select(
+        Contact.id,
+        Contact.email,
+        Contact.phone_number,
+        Contact.linked_id,
+        Contact.link_precedence
+    ).join(cluster, Contact.id == cluster.c.id)
+
+
+def _cluster_params(email: Optional[str], phone: Optional[str]) -> Dict[str, str]:
+    """Bound values for the cluster statements, only for the keys present"""
+    params = {}
+    if email:
+        params["email"] = email
+    if phone:
+        params["phone"] = phone
+    return params
+
+
+def _is_primary(contact) -> bool:
+    """Contact.is_primary() for both ORM contacts and plain cluster rows"""
+    return contact.link_precedence == "primary" and contact.linked_id is None
+
+
+@dataclass
+class ContactCluster:
+    """
+    Plain snapshot of a primary contact and its linked information
+    Detached from the session so the response can be built after it closes
+    """
+    primary_id: int
+    emails: List[str]
+    phone_numbers: List[str]
+    secondary_ids: List[int]
 
 
 class IdentityService:
@@ -22,7 +122,17 @@ class IdentityService:
     """
     
     def __init__(self):
-        self.db_manager = db_manager
+        self.response_cache = IdentifyCache(
+            maxsize=settings.IDENTIFY_CACHE_SIZE,
+            ttl=settings.IDENTIFY_CACHE_TTL
+        )
+        # Reconciliations currently running, keyed like the response cache
+        self._inflight: Dict[Tuple, "asyncio.Task"] = {}
+    
+    @property
+    def db_manager(self) -> DatabaseManager:
+        """Shared database manager, resolved on first use"""
+        return get_db_manager()
     
     async def _ensure_relationships_loaded(self, session: AsyncSession, contact: Contact) -> Contact:
         """
@@ -42,34 +152,88 @@ class IdentityService:
         """
         Main orchestration method for identity reconciliation
         
+        Serves repeated requests from the response cache, and collapses
+        concurrent identical requests onto a single reconciliation.
+        """
+        cache_key = (request.email, request.phoneNumber)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._reconcile_contact(request, cache_key))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda t: self._forget_inflight(cache_key, t))
+        # Shield so one caller disconnecting doesn't cancel the others' result
+        return await asyncio.shield(task)
+    
+    def _forget_inflight(self, cache_key: Tuple, task: "asyncio.Task") -> None:
+        """Drop a finished reconciliation from the in-flight table"""
+        self._inflight.pop(cache_key, None)
+        if not task.cancelled():
+            # Mark any exception as retrieved; awaiting callers re-raise it themselves
+            task.exception()
+    
+    async def _reconcile_contact(self, request: IdentifyRequest, cache_key: Tuple) -> IdentifyResponse:
+        """
+        Reconcile a request against the database
+        
         Algorithm:
         1. Find existing contacts matching email or phone
         2. If no matches -> create new primary contact
         3. If matches found -> determine linking strategy
         4. Return consolidated contact information
         """
+        generation = self.response_cache.generation
+        
         async with self.db_manager.get_session() as session:
-            # Step 1: Find related contacts
-            existing_contacts = await self._find_related_contacts(
+            # Most requests change nothing, so read the clusters as plain rows first
+            # and only hydrate ORM contacts when something has to be written
+            cluster = await self._find_unchanged_cluster(
                 session, request.email, request.phoneNumber
             )
             
-            if not existing_contacts:
-                # Step 2: No matches - create new primary contact
-                new_contact = await self._create_primary_contact(
+            if cluster is None:
+                # Writers for the same email/phone are serialized, so concurrent
+                # requests can't both create a primary for a new customer
+                await self._lock_identity_keys(session, request.email, request.phoneNumber)
+                
+                # Step 1: Find related contacts, with their clusters locked
+                existing_contacts = await self._find_locked_contacts(
                     session, request.email, request.phoneNumber
                 )
+                
+                if not existing_contacts:
+                    # Step 2: No matches - create new primary contact
+                    primary_contact = await self._create_primary_contact(
+                        session, request.email, request.phoneNumber
+                    )
+                else:
+                    # Step 3: Matches found - determine linking strategy
+                    primary_contact = await self._handle_contact_linking(
+                        session, existing_contacts, request.email, request.phoneNumber
+                    )
                 await session.commit()
-                return await self._build_consolidated_response(session, new_contact)
-            
-            # Step 3: Matches found - determine linking strategy
-            primary_contact = await self._handle_contact_linking(
-                session, existing_contacts, request.email, request.phoneNumber
-            )
-            await session.commit()
-            
-            # Step 4: Return consolidated response
-            return await self._build_consolidated_response(session, primary_contact)
+                
+                # Step 4: Snapshot the consolidated contact information
+                cluster = self._collect_cluster(primary_contact)
+        
+        # Session is released; building the response needs no connection
+        response = self._build_consolidated_response(cluster)
+        
+        # Only responses that changed nothing are cacheable; writes invalidate the
+        # cached responses of the clusters they touched
+        changed_primary_ids = session.info.get("changed_primary_ids")
+        if changed_primary_ids:
+            self.response_cache.invalidate(changed_primary_ids)
+        else:
+            self.response_cache.set(cache_key, response, generation, cluster.primary_id)
+        return response
+    
+    def _mark_changed(self, session: AsyncSession, *primary_ids: int) -> None:
+        """Record the clusters this session wrote to, by primary contact ID"""
+        session.info.setdefault("changed_primary_ids", set()).update(primary_ids)
     
     async def _find_related_contacts(
         self, 
@@ -81,43 +245,119 @@ class IdentityService:
         Find all contacts that match the provided email or phone number
         Returns both primary and secondary contacts
         """
-        conditions = []
-        
-        if email:
-            conditions.append(Contact.email == email)
-        if phone:
-            conditions.append(Contact.phone_number == phone)
-        
-        if not conditions:
+        if not (email or phone):
             return []
         
-        # Find contacts matching email OR phone
-        query = select(Contact).where(
-            and_(
-                or_(*conditions),
-                Contact.deleted_at.is_(None)  # Only active contacts
-            )
-        ).options(
-            selectinload(Contact.secondary_contacts),
-            selectinload(Contact.primary_contact).selectinload(Contact.secondary_contacts)
+        # The whole cluster in one query; secondary_contacts are selectin-loaded
+        # and primary_contact resolves from the identity map
+        result = await session.execute(
+            _cluster_contacts_stmt(bool(email), bool(phone)), _cluster_params(email, phone)
         )
+        return list(result.scalars().all())
+    
+    async def _find_locked_contacts(
+        self,
+        session: AsyncSession,
+        email: Optional[str],
+        phone: Optional[str]
+    ) -> List[Contact]:
+        """
+        Find the related contacts with every primary they belong to locked
         
-        result = await session.execute(query)
-        contacts = result.scalars().all()
-        
-        # Also find all related contacts (primary and their secondaries)
-        all_related = set(contacts)
-        for contact in contacts:
-            if contact.is_primary():
-                # Add all secondary contacts
-                all_related.update(contact.secondary_contacts)
-            else:
-                # Add primary contact and its other secondaries
-                if contact.primary_contact:
-                    all_related.add(contact.primary_contact)
-                    all_related.update(contact.primary_contact.secondary_contacts)
-        
-        return list(all_related)
+        The identity key locks only order requests that share an email or phone.
+        Requests reaching the same primary through different keys (a merge and a
+        new secondary, or two overlapping merges) are ordered by these locks, so
+        the primaries read here are still primaries when they are written to.
+        If the cluster grew while waiting, its new primaries are locked as well
+        and it is read again.
+        """
+        contacts = await self._find_related_contacts(session, email, phone)
+        if session.bind.dialect.name != "postgresql":
+            return contacts
+        
+        locked = set()
+        while True:
+            primary_ids = {
+                contact.id if contact.linked_id is None else contact.linked_id
+                for contact in contacts
+            } - locked
+            if not primary_ids:
+                return contacts
+            # Sorted so overlapping requests take shared locks in the same order
+            ids = sorted(primary_ids)
+            await session.execute(_LOCK_PRIMARY_IDS_STMT, {"ids": ids})
+            locked.update(ids)
+            contacts = await self._find_related_contacts(session, email, phone)
+    
+    async def _find_unchanged_cluster(
+        self,
+        session: AsyncSession,
+        email: Optional[str],
+        phone: Optional[str]
+    ) -> Optional[ContactCluster]:
+        """
+        Read the clusters related to email/phone as plain rows in one query
+        Returns the cluster when the request would change nothing, or None when
+        reconciliation has to create or relink contacts
+        """
+        if not (email or phone):
+            return None
+        
+        rows = (await session.execute(
+            _cluster_rows_stmt(bool(email), bool(phone)), _cluster_params(email, phone)
+        )).all()
+        if not rows:
+            return None
+        
+        # Same decisions as _handle_contact_linking, minus the ones that write,
+        # in one pass that also notes whether the request's values are known
+        primaries = []
+        email_known = not email
+        phone_known = not phone
+        for row in rows:
+            if row.email == email and row.phone_number == phone:
+                primary_id = row.id if _is_primary(row) else row.linked_id
+                break
+            if _is_primary(row):
+                primaries.append(row.id)
+            if not email_known and row.email == email:
+                email_known = True
+            if not phone_known and row.phone_number == phone:
+                phone_known = True
+        else:
+            if len(primaries) != 1 or not (email_known and phone_known):
+                return None
+            primary_id = primaries[0]
+        
+        primary = next((row for row in rows if row.id == primary_id), None)
+        if primary is None or not _is_primary(primary):
+            return None
+        return self._assemble_cluster(
+            primary.id,
+            primary.email,
+            primary.phone_number,
+            [(row.id, row.email, row.phone_number) for row in rows if row.linked_id == primary_id]
+        )
+    
+    async def _lock_identity_keys(
+        self,
+        session: AsyncSession,
+        email: Optional[str],
+        phone: Optional[str]
+    ) -> None:
+        """
+        Take transaction-scoped advisory locks on the request's email and phone
+        Keys are sorted so two requests sharing both keys can't deadlock
+        """
+        if session.bind.dialect.name != "postgresql":
+            return
+        keys = sorted(
+            key for key in (
+                f"email:{email}" if email else None,
+                f"phone:{phone}" if phone else None
+            ) if key
+        )
+        await session.execute(_LOCK_IDENTITY_KEYS_STMT, {"keys": keys})
     
     async def _create_primary_contact(
         self, 
@@ -128,17 +368,47 @@ class IdentityService:
         """
         Create a new primary contact with the provided information
         """
+        contact = await self._insert_contact(session, email, phone, None, "primary")
+        self._mark_changed(session, contact.id)
+        return contact
+    
+    async def _insert_contact(
+        self,
+        session: AsyncSession,
+        email: Optional[str],
+        phone: Optional[str],
+        linked_id: Optional[int],
+        link_precedence: str
+    ) -> Contact:
+        """
+        Insert one contact with a Core INSERT ... RETURNING and attach it as persistent
+        Skips the unit-of-work flush for what is always a single-row insert
+        """
+        row = (await session.execute(
+            insert(Contact)
+            .values(
+                email=email,
+                phone_number=phone,
+                linked_id=linked_id,
+                link_precedence=link_precedence
+            )
+            .returning(Contact.id, Contact.created_at, Contact.updated_at)
+        )).one()
+        
         contact = Contact(
+            id=row.id,
             email=email,
             phone_number=phone,
-            linked_id=None,
-            link_precedence="primary",
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            linked_id=linked_id,
+            link_precedence=link_precedence,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            deleted_at=None,
+            secondary_contacts=[]  # New contact; nothing to load later
         )
-        
+        # Already in the database: mark the state as loaded, then attach without an INSERT
+        make_transient_to_detached(contact)
         session.add(contact)
-        await session.flush()  # Get the ID
         return contact
     
     async def _handle_contact_linking(
@@ -156,15 +426,20 @@ class IdentityService:
         2. New information -> create secondary contact  
         3. Link two primaries -> convert newer to secondary
         """
-        # Separate primary and secondary contacts
-        primaries = [c for c in existing_contacts if c.is_primary()]
-        secondaries = [c for c in existing_contacts if c.is_secondary()]
-        
-        # Check if this exact combination already exists
-        exact_match = self._find_exact_match(existing_contacts, email, phone)
-        if exact_match:
-            # Return the primary contact for this match
-            return exact_match if exact_match.is_primary() else exact_match.primary_contact
+        # One pass: stop at an exact email+phone match, otherwise separate
+        # primaries and remember the first secondary as a fallback
+        primaries = []
+        first_secondary = None
+        for contact in existing_contacts:
+            # Same predicate as the read-only path, so both classify a cluster alike
+            is_primary = _is_primary(contact)
+            if contact.email == email and contact.phone_number == phone:
+                # Return the primary contact for this match
+                return contact if is_primary else contact.primary_contact
+            if is_primary:
+                primaries.append(contact)
+            elif first_secondary is None:
+                first_secondary = contact
         
         if len(primaries) == 1:
             # Case 1: One primary found - create secondary with new info if needed
@@ -183,21 +458,7 @@ class IdentityService:
         else:
             # Only secondaries found - return the primary of the first secondary
             # This shouldn't normally happen with proper data integrity
-            return secondaries[0].primary_contact
-    
-    def _find_exact_match(
-        self, 
-        contacts: List[Contact], 
-        email: Optional[str], 
-        phone: Optional[str]
-    ) -> Optional[Contact]:
-        """
-        Check if exact email+phone combination already exists
-        """
-        for contact in contacts:
-            if contact.email == email and contact.phone_number == phone:
-                return contact
-        return None
+            return first_secondary.primary_contact
     
     def _has_new_information(
         self, 
@@ -208,21 +469,18 @@ class IdentityService:
         """
         Check if the request contains new information not in the primary contact
         """
-        # Get all information from primary and its secondaries
-        all_emails = {primary.email} if primary.email else set()
-        all_phones = {primary.phone_number} if primary.phone_number else set()
-        
-        # Only iterate through secondary_contacts if the relationship is loaded
-        if primary.secondary_contacts is not None:
-            for secondary in primary.secondary_contacts:
-                if secondary.email:
-                    all_emails.add(secondary.email)
-                if secondary.phone_number:
-                    all_phones.add(secondary.phone_number)
+        # Only values the primary doesn't already carry need looking up
+        has_new_email = bool(email) and email != primary.email
+        has_new_phone = bool(phone) and phone != primary.phone_number
         
-        # Check if we have new information
-        has_new_email = email and email not in all_emails
-        has_new_phone = phone and phone not in all_phones
+        # Scan the loaded secondaries, stopping once every value has been seen
+        for secondary in primary.secondary_contacts:
+            if not (has_new_email or has_new_phone):
+                break
+            if has_new_email and secondary.email == email:
+                has_new_email = False
+            if has_new_phone and secondary.phone_number == phone:
+                has_new_phone = False
         
         return has_new_email or has_new_phone
     
@@ -236,17 +494,15 @@ class IdentityService:
         """
         Create a secondary contact linked to the primary
         """
-        secondary = Contact(
-            email=email,
-            phone_number=phone,
-            linked_id=primary.id,
-            link_precedence="secondary",
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
-        )
+        secondary = await self._insert_contact(session, email, phone, primary.id, "secondary")
         
-        session.add(secondary)
-        await session.flush()
+        # Keep the loaded relationships current for the response; the row is
+        # already written, so this is recorded as loaded state, not a change
+        set_committed_value(secondary, "primary_contact", primary)
+        set_committed_value(
+            primary, "secondary_contacts", list(primary.secondary_contacts) + [secondary]
+        )
+        self._mark_changed(session, primary.id)
         return secondary
     
     async def _link_primary_contacts(
@@ -260,23 +516,35 @@ class IdentityService:
         Link multiple primary contacts by converting newer ones to secondary
         The oldest primary remains primary
         """
-        # Sort by created_at to find the oldest
-        primaries.sort(key=lambda c: c.created_at)
-        oldest_primary = primaries[0]
-        newer_primaries = primaries[1:]
+        # The oldest primary survives; min() finds it in one pass without
+        # reordering the caller's list
+        oldest_primary = min(primaries, key=lambda c: c.created_at)
+        newer_primaries = [primary for primary in primaries if primary is not oldest_primary]
+        self._mark_changed(session, *(primary.id for primary in primaries))
         
-        # Convert newer primaries to secondaries
+        # Convert newer primaries, and any secondaries linked to them, to secondaries
+        # of the oldest primary in one UPDATE (updated_at is set by the column's
+        # onupdate); loaded objects are synchronized in place
+        newer_ids = [primary.id for primary in newer_primaries]
+        moved = list(newer_primaries)
         for primary in newer_primaries:
-            primary.linked_id = oldest_primary.id
-            primary.link_precedence = "secondary"
-            primary.updated_at = datetime.utcnow()
-            
-            # Ensure secondary_contacts relationship is loaded before accessing
-            if primary.secondary_contacts is not None:
-                # Also update any secondaries that were linked to this primary
-                for secondary in primary.secondary_contacts:
-                    secondary.linked_id = oldest_primary.id
-                    secondary.updated_at = datetime.utcnow()
+            moved.extend(primary.secondary_contacts)
+        
+        await session.execute(
+            update(Contact)
+            .where(or_(Contact.id.in_(newer_ids), Contact.linked_id.in_(newer_ids)))
+            .values(linked_id=oldest_primary.id, link_precedence="secondary")
+        )
+        
+        # The bulk UPDATE skips relationship bookkeeping, so record the new links as
+        # loaded state; the response is built from these collections without a refresh
+        for primary in newer_primaries:
+            set_committed_value(primary, "secondary_contacts", [])
+        for contact in moved:
+            set_committed_value(contact, "primary_contact", oldest_primary)
+        set_committed_value(
+            oldest_primary, "secondary_contacts", list(oldest_primary.secondary_contacts) + moved
+        )
         
         # Create new secondary if we have new information
         if self._has_new_information(oldest_primary, email, phone):
@@ -284,60 +552,91 @@ class IdentityService:
         
         return oldest_primary
     
-    async def _build_consolidated_response(
-        self, 
-        session: AsyncSession, 
-        primary_contact: Contact
-    ) -> IdentifyResponse:
+    def _collect_cluster(self, primary_contact: Contact) -> ContactCluster:
+        """
+        Snapshot the consolidated contact information from the loaded contacts
+        The cluster query loaded every secondary_contacts collection and the write
+        helpers keep them current, so no refresh query is needed
         """
-        Build the consolidated response with all contact information
+        return self._assemble_cluster(
+            primary_contact.id,
+            primary_contact.email,
+            primary_contact.phone_number,
+            [(secondary.id, secondary.email, secondary.phone_number)
+             for secondary in primary_contact.secondary_contacts]
+        )
+    
+    def _assemble_cluster(
+        self,
+        primary_id: int,
+        primary_email: Optional[str],
+        primary_phone: Optional[str],
+        secondaries: List[Tuple[int, Optional[str], Optional[str]]]
+    ) -> ContactCluster:
+        """
+        Order a cluster's values for the response from (id, email, phone) tuples
         FIXED: Ensures primary contact info appears first in arrays as per requirements
         """
-        # Refresh the primary contact to get updated relationships
-        await session.refresh(primary_contact, ['secondary_contacts'])
-        
         # Initialize arrays - primary contact info goes first
-        emails = []
-        phone_numbers = []
-        secondary_ids = []
+        emails = [primary_email] if primary_email else []
+        phone_numbers = [primary_phone] if primary_phone else []
+        
+        # A lone primary is the most common cluster; nothing to merge or sort
+        if not secondaries:
+            return ContactCluster(
+                primary_id=primary_id,
+                emails=emails,
+                phone_numbers=phone_numbers,
+                secondary_ids=[]
+            )
         
-        # Add primary contact info FIRST (as required by API spec)
-        if primary_contact.email:
-            emails.append(primary_contact.email)
-        if primary_contact.phone_number:
-            phone_numbers.append(primary_contact.phone_number)
+        secondary_ids = []
         
-        # Collect secondary contact info (excluding duplicates)
-        secondary_emails = []
-        secondary_phones = []
+        # Collect unique secondary contact info in sets, so large clusters
+        # don't pay a list scan per value
+        secondary_emails = set()
+        secondary_phones = set()
         
-        for secondary in primary_contact.secondary_contacts:
+        for secondary_id, secondary_email, secondary_phone in secondaries:
             # Add secondary contact ID
-            secondary_ids.append(secondary.id)
+            secondary_ids.append(secondary_id)
             
-            # Collect unique emails and phones from secondaries
-            if secondary.email and secondary.email not in emails:
-                secondary_emails.append(secondary.email)
-            if secondary.phone_number and secondary.phone_number not in phone_numbers:
-                secondary_phones.append(secondary.phone_number)
-        
-        # Sort only the secondary info for consistency, then append to primary info
-        secondary_emails.sort()
-        secondary_phones.sort()
+            if secondary_email:
+                secondary_emails.add(secondary_email)
+            if secondary_phone:
+                secondary_phones.add(secondary_phone)
+        
+        # The primary's values are already listed first
+        secondary_emails.discard(primary_email)
+        secondary_phones.discard(primary_phone)
         secondary_ids.sort()
         
         # Final arrays: primary info first, then sorted secondary info
-        emails.extend(secondary_emails)
-        phone_numbers.extend(secondary_phones)
+        emails.extend(sorted(secondary_emails))
+        phone_numbers.extend(sorted(secondary_phones))
         
-        contact_response = ContactResponse(
-            primaryContatId=primary_contact.id,
+        return ContactCluster(
+            primary_id=primary_id,
             emails=emails,
-            phoneNumbers=phone_numbers,
-            secondaryContactIds=secondary_ids
+            phone_numbers=phone_numbers,
+            secondary_ids=secondary_ids
+        )
+    
+    def _build_consolidated_response(self, cluster: ContactCluster) -> IdentifyResponse:
+        """
+        Build the API response from a cluster snapshot (no database access)
+        Trust boundary: the snapshot holds database IDs and values that passed
+        IdentifyRequest validation on the way in, so the response models are
+        constructed without re-running validation
+        """
+        contact_response = ContactResponse.model_construct(
+            primaryContatId=cluster.primary_id,
+            emails=cluster.emails,
+            phoneNumbers=cluster.phone_numbers,
+            secondaryContactIds=cluster.secondary_ids
         )
         
-        return IdentifyResponse(contact=contact_response)
+        return IdentifyResponse.model_construct(contact=contact_response)
 
 
 # Global service instance
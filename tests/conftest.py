@@ -0,0 +1,49 @@
+"""
+Shared fixtures for the test suite
+Runs the service against a throwaway SQLite database through aiosqlite;
+the Postgres-only advisory locks are skipped on other dialects
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+# The application modules import each other from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from models.base import Base
+from services import identity_service as identity_service_module
+from services.identity_service import IdentityService
+
+
+@pytest.fixture
+def db_manager(tmp_path, monkeypatch):
+    """DatabaseManager bound to a fresh SQLite file, used by the identity service"""
+    # NullPool so no connection outlives the event loop of the test that opened it
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", poolclass=NullPool)
+    manager = DatabaseManager()
+    manager._engine = engine
+    manager._session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+    )
+    
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    
+    asyncio.run(create_tables())
+    monkeypatch.setattr(identity_service_module, "get_db_manager", lambda: manager)
+    return manager
+
+
+@pytest.fixture
+def service(db_manager):
+    """IdentityService with the response cache disabled, so every call hits the database"""
+    service = IdentityService()
+    service.response_cache.maxsize = 0
+    return service
@@ -0,0 +1,107 @@
+"""
+Tests for the in-process /identify response cache
+"""
+
+import pytest
+
+from services import identify_cache as identify_cache_module
+from services.identify_cache import IdentifyCache
+
+
+class _Clock:
+    """Stand-in for time.monotonic that only moves when told to"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(identify_cache_module.time, "monotonic", clock)
+    return clock
+
+
+def test_returns_stored_value(clock):
+    cache = IdentifyCache(maxsize=10, ttl=30)
+    cache.set("a", "value", cache.generation, primary_id=1)
+
+    assert cache.get("a") == "value"
+    assert cache.get("missing") is None
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = IdentifyCache(maxsize=10, ttl=30)
+    cache.set("a", "value", cache.generation, primary_id=1)
+
+    clock.now += 29
+    assert cache.get("a") == "value"
+    clock.now += 1
+    assert cache.get("a") is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = IdentifyCache(maxsize=2, ttl=30)
+    cache.set("a", "A", cache.generation, primary_id=1)
+    cache.set("b", "B", cache.generation, primary_id=2)
+    cache.get("a")
+    cache.set("c", "C", cache.generation, primary_id=3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+
+
+def test_result_from_before_a_write_is_not_stored(clock):
+    cache = IdentifyCache(maxsize=10, ttl=30)
+    generation = cache.generation
+    cache.invalidate([2])
+    cache.set("a", "stale", generation, primary_id=1)
+
+    assert cache.get("a") is None
+
+
+def test_invalidate_drops_only_the_given_clusters(clock):
+    cache = IdentifyCache(maxsize=10, ttl=30)
+    cache.set("a", "A", cache.generation, primary_id=1)
+    cache.set("b", "B", cache.generation, primary_id=1)
+    cache.set("c", "C", cache.generation, primary_id=2)
+
+    cache.invalidate([1])
+
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert cache.get("c") == "C"
+
+
+def test_invalidate_without_ids_drops_everything(clock):
+    cache = IdentifyCache(maxsize=10, ttl=30)
+    cache.set("a", "A", cache.generation, primary_id=1)
+    cache.set("b", "B", cache.generation, primary_id=2)
+
+    cache.invalidate()
+
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+
+
+def test_reassigned_key_leaves_its_old_cluster(clock):
+    cache = IdentifyCache(maxsize=10, ttl=30)
+    cache.set("a", "old", cache.generation, primary_id=1)
+    cache.set("a", "new", cache.generation, primary_id=2)
+
+    cache.invalidate([1])
+
+    assert cache.get("a") == "new"
+
+
+@pytest.mark.parametrize("maxsize, ttl", [(0, 30), (10, 0)])
+def test_zero_size_or_ttl_disables_caching(clock, maxsize, ttl):
+    cache = IdentifyCache(maxsize=maxsize, ttl=ttl)
+    cache.set("a", "A", cache.generation, primary_id=1)
+
+    assert not cache.enabled
+    assert cache.get("a") is None
@@ -0,0 +1,160 @@
+"""
+Tests for the identity reconciliation service
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, update
+
+from models.contact import Contact
+from schemas.identify import IdentifyRequest
+
+
+def _request(email=None, phone=None) -> IdentifyRequest:
+    return IdentifyRequest(email=email, phoneNumber=phone)
+
+
+async def _contacts(db_manager):
+    """Every stored contact, ordered by ID"""
+    async with db_manager.get_session() as session:
+        result = await session.execute(select(Contact).order_by(Contact.id))
+        return list(result.scalars().all())
+
+
+async def _make_older(db_manager, contact_id: int):
+    """Backdate a contact; SQLite timestamps only have second resolution"""
+    async with db_manager.get_session() as session:
+        await session.execute(
+            update(Contact).where(Contact.id == contact_id).values(created_at=datetime(2020, 1, 1))
+        )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_email_and_phone_creates_primary(service):
+    response = await service.identify_contact(_request("lorraine@hillvalley.edu", "123456"))
+
+    contact = response.contact
+    assert contact.emails == ["lorraine@hillvalley.edu"]
+    assert contact.phoneNumbers == ["123456"]
+    assert contact.secondaryContactIds == []
+
+
+@pytest.mark.asyncio
+async def test_single_key_creates_primary(service, db_manager):
+    by_email = (await service.identify_contact(_request(email="doc@hillvalley.edu"))).contact
+    by_phone = (await service.identify_contact(_request(phone="555000"))).contact
+
+    assert by_email.emails == ["doc@hillvalley.edu"]
+    assert by_email.phoneNumbers == []
+    assert by_phone.emails == []
+    assert by_phone.phoneNumbers == ["555000"]
+    assert by_email.primaryContatId != by_phone.primaryContatId
+
+    contacts = await _contacts(db_manager)
+    assert [contact.link_precedence for contact in contacts] == ["primary", "primary"]
+
+
+@pytest.mark.asyncio
+async def test_new_information_creates_secondary(service, db_manager):
+    first = (await service.identify_contact(_request("lorraine@hillvalley.edu", "123456"))).contact
+    second = (await service.identify_contact(_request("mcfly@hillvalley.edu", "123456"))).contact
+
+    assert second.primaryContatId == first.primaryContatId
+    assert second.emails == ["lorraine@hillvalley.edu", "mcfly@hillvalley.edu"]
+    assert second.phoneNumbers == ["123456"]
+
+    contacts = await _contacts(db_manager)
+    assert len(contacts) == 2
+    secondary = contacts[1]
+    assert second.secondaryContactIds == [secondary.id]
+    assert secondary.link_precedence == "secondary"
+    assert secondary.linked_id == first.primaryContatId
+
+
+@pytest.mark.asyncio
+async def test_exact_repeat_writes_nothing(service, db_manager):
+    await service.identify_contact(_request("lorraine@hillvalley.edu", "123456"))
+    await service.identify_contact(_request("mcfly@hillvalley.edu", "123456"))
+
+    first = await service.identify_contact(_request("mcfly@hillvalley.edu", "123456"))
+    repeat = await service.identify_contact(_request("mcfly@hillvalley.edu", "123456"))
+
+    assert repeat.contact.model_dump() == first.contact.model_dump()
+    assert len(await _contacts(db_manager)) == 2
+
+
+@pytest.mark.asyncio
+async def test_single_key_lookup_returns_cluster(service, db_manager):
+    await service.identify_contact(_request("lorraine@hillvalley.edu", "123456"))
+    full = (await service.identify_contact(_request("mcfly@hillvalley.edu", "123456"))).contact
+
+    by_email = (await service.identify_contact(_request(email="mcfly@hillvalley.edu"))).contact
+    by_phone = (await service.identify_contact(_request(phone="123456"))).contact
+
+    assert by_email.model_dump() == full.model_dump()
+    assert by_phone.model_dump() == full.model_dump()
+    assert len(await _contacts(db_manager)) == 2
+
+
+@pytest.mark.asyncio
+async def test_request_linking_two_primaries_merges_them(service, db_manager):
+    george = (await service.identify_contact(_request("george@hillvalley.edu", "919191"))).contact
+    biff = (await service.identify_contact(_request("biffsucks@hillvalley.edu", "717171"))).contact
+    await _make_older(db_manager, george.primaryContatId)
+
+    merged = (await service.identify_contact(_request("george@hillvalley.edu", "717171"))).contact
+
+    assert merged.primaryContatId == george.primaryContatId
+    assert merged.emails == ["george@hillvalley.edu", "biffsucks@hillvalley.edu"]
+    assert merged.phoneNumbers == ["919191", "717171"]
+    assert merged.secondaryContactIds == [biff.primaryContatId]
+
+    # Both values were already known, so the merge adds no contact
+    contacts = await _contacts(db_manager)
+    assert len(contacts) == 2
+    demoted = contacts[1]
+    assert demoted.link_precedence == "secondary"
+    assert demoted.linked_id == george.primaryContatId
+
+
+@pytest.mark.asyncio
+async def test_merge_moves_secondaries_of_the_newer_primary(service, db_manager):
+    george = (await service.identify_contact(_request("george@hillvalley.edu", "919191"))).contact
+    biff = (await service.identify_contact(_request("biffsucks@hillvalley.edu", "717171"))).contact
+    biff = (await service.identify_contact(_request("biff@hillvalley.edu", "717171"))).contact
+    await _make_older(db_manager, george.primaryContatId)
+
+    merged = (await service.identify_contact(_request("george@hillvalley.edu", "717171"))).contact
+
+    assert merged.primaryContatId == george.primaryContatId
+    assert merged.secondaryContactIds == [biff.primaryContatId, *biff.secondaryContactIds]
+    assert merged.emails == [
+        "george@hillvalley.edu", "biff@hillvalley.edu", "biffsucks@hillvalley.edu"
+    ]
+
+    # No secondary is left pointing at the demoted primary
+    contacts = await _contacts(db_manager)
+    assert {contact.linked_id for contact in contacts[1:]} == {george.primaryContatId}
+
+    # The merged cluster reads the same afterwards through any of its keys
+    by_phone = (await service.identify_contact(_request(phone="919191"))).contact
+    assert by_phone.model_dump() == merged.model_dump()
+
+
+@pytest.mark.asyncio
+async def test_cached_response_is_invalidated_by_a_write(service, db_manager):
+    service.response_cache.maxsize = 100
+
+    # The creating call writes, so only the read that follows it is cached
+    await service.identify_contact(_request(phone="123456"))
+    cached = (await service.identify_contact(_request(phone="123456"))).contact
+    assert (await service.identify_contact(_request(phone="123456"))).contact is cached
+
+    # A new secondary in the cluster drops its cached responses
+    await service.identify_contact(_request("lorraine@hillvalley.edu", "123456"))
+    await service.identify_contact(_request("mcfly@hillvalley.edu", "123456"))
+    after = (await service.identify_contact(_request(phone="123456"))).contact
+
+    assert after.emails == ["lorraine@hillvalley.edu", "mcfly@hillvalley.edu"]